@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import orjson
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-from backend.spotify_metadata import fill_rows
-
 
 class FillRequest(BaseModel):
     urls: list[str] = Field(default_factory=list)
@@ -20,7 +24,21 @@ class FillResponse(BaseModel):
     rows: list[FillRow]
 
 
-app = FastAPI(title="Spotify Metadata API (Vercel)", version="1.0.0")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    spotify_metadata = sys.modules.get("backend.spotify_metadata")
+    if spotify_metadata is not None:
+        await spotify_metadata.close_client_session()
+        await spotify_metadata.close_metadata_cache()
+
+
+app = FastAPI(
+    title="Spotify Metadata API (Vercel)",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 
 @app.get("/health")
@@ -29,19 +47,62 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-def _fill_from_urls(payload: FillRequest) -> FillResponse:
+async def _fill_from_urls(payload: FillRequest) -> ORJSONResponse:
+    from backend.spotify_metadata import fill_rows_async
+
     try:
-        result_rows = fill_rows(payload.urls)
+        result_rows = await fill_rows_async(payload.urls)
     except Exception as exc:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch track metadata: {exc}",
         ) from exc
 
-    return FillResponse(rows=result_rows)
-
-
-@app.post("/fill-from-urls", response_model=FillResponse)
-@app.post("/api/fill-from-urls", response_model=FillResponse)
-def fill_from_urls(payload: FillRequest) -> FillResponse:
-    return _fill_from_urls(payload)
+    return ORJSONResponse(
+        {
+            "rows": [
+                {
+                    "url": row["url"],
+                    "artist": row["artist"],
+                    "track_name": row["track_name"],
+                }
+                for row in result_rows
+            ]
+        }
+    )
+
+
+@app.post(
+    "/fill-from-urls",
+    response_model=None,
+    responses={200: {"model": FillResponse}},
+)
+@app.post(
+    "/api/fill-from-urls",
+    response_model=None,
+    responses={200: {"model": FillResponse}},
+)
+async def fill_from_urls(payload: FillRequest) -> ORJSONResponse:
+    return await _fill_from_urls(payload)
+
+
+async def _stream_fill_rows(urls: list[str]) -> AsyncIterator[bytes]:
+    from backend.spotify_metadata import iter_fill_rows
+
+    async for index, row in iter_fill_rows(urls):
+        yield orjson.dumps(
+            {
+                "index": index,
+                "url": row["url"],
+                "artist": row["artist"],
+                "track_name": row["track_name"],
+            }
+        ) + b"\n"
+
+
+@app.post("/fill-from-urls/stream")
+@app.post("/api/fill-from-urls/stream")
+async def fill_from_urls_stream(payload: FillRequest) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_fill_rows(payload.urls), media_type="application/x-ndjson"
+    )
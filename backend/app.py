@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 try:
-    from .spotify_metadata import fill_rows
+    from .spotify_metadata import (
+        close_client_session,
+        close_metadata_cache,
+        fill_rows_async,
+        iter_fill_rows,
+    )
 except ImportError:
-    from spotify_metadata import fill_rows
+    from spotify_metadata import (
+        close_client_session,
+        close_metadata_cache,
+        fill_rows_async,
+        iter_fill_rows,
+    )
 
 
 class FillRequest(BaseModel):
@@ -24,7 +39,19 @@ class FillResponse(BaseModel):
     rows: list[FillRow]
 
 
-app = FastAPI(title="Spotify Metadata API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    await close_client_session()
+    await close_metadata_cache()
+
+
+app = FastAPI(
+    title="Spotify Metadata API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -42,14 +69,48 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/api/fill-from-urls", response_model=FillResponse)
-def fill_from_urls(payload: FillRequest) -> FillResponse:
+@app.post(
+    "/api/fill-from-urls",
+    response_model=None,
+    responses={200: {"model": FillResponse}},
+)
+async def fill_from_urls(payload: FillRequest) -> ORJSONResponse:
     try:
-        result_rows = fill_rows(payload.urls)
+        result_rows = await fill_rows_async(payload.urls)
     except Exception as exc:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch track metadata: {exc}",
         ) from exc
 
-    return FillResponse(rows=result_rows)
+    return ORJSONResponse(
+        {
+            "rows": [
+                {
+                    "url": row["url"],
+                    "artist": row["artist"],
+                    "track_name": row["track_name"],
+                }
+                for row in result_rows
+            ]
+        }
+    )
+
+
+async def _stream_fill_rows(urls: list[str]) -> AsyncIterator[bytes]:
+    async for index, row in iter_fill_rows(urls):
+        yield orjson.dumps(
+            {
+                "index": index,
+                "url": row["url"],
+                "artist": row["artist"],
+                "track_name": row["track_name"],
+            }
+        ) + b"\n"
+
+
+@app.post("/api/fill-from-urls/stream")
+async def fill_from_urls_stream(payload: FillRequest) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_fill_rows(payload.urls), media_type="application/x-ndjson"
+    )
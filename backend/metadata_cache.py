@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Union
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "spotify_meta"
+_CACHES: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class DiskMetadataCache:
+    def __init__(self, directory: str | Path, restrict_existing: bool = False) -> None:
+        import diskcache
+
+        directory = Path(directory)
+        try:
+            directory.mkdir(mode=0o700, parents=True)
+        except FileExistsError:
+            if restrict_existing:
+                directory.chmod(0o700)
+        self.stores_tokens = not directory.stat().st_mode & 0o077
+        self._cache = diskcache.Cache(
+            str(directory), eviction_policy="least-recently-used"
+        )
+
+    def _get_many(self, keys: list[str]) -> dict[str, str]:
+        values = {}
+        for key in keys:
+            value = self._cache.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def _set_many(self, items: dict[str, str], ttl_seconds: int) -> None:
+        for key, value in items.items():
+            self._cache.set(key, value, expire=ttl_seconds)
+
+    async def get_many(self, keys: list[str]) -> dict[str, str]:
+        return await asyncio.to_thread(self._get_many, keys)
+
+    async def set_many(self, items: dict[str, str], ttl_seconds: int) -> None:
+        await asyncio.to_thread(self._set_many, items, ttl_seconds)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._cache.close)
+
+
+class RedisMetadataCache:
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis
+
+        self.stores_tokens = True
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    async def get_many(self, keys: list[str]) -> dict[str, str]:
+        values = await self._client.mget(keys)
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(self, items: dict[str, str], ttl_seconds: int) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, value, ex=ttl_seconds)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+MetadataCache = Union[DiskMetadataCache, RedisMetadataCache]
+
+
+def get_metadata_cache() -> MetadataCache | None:
+    loop = asyncio.get_running_loop()
+    if loop in _CACHES:
+        return _CACHES[loop]
+
+    redis_url = str(os.getenv("REDIS_URL") or "").strip()
+    cache_dir = str(os.getenv("SPOTIFY_CACHE_DIR") or "").strip()
+    try:
+        if redis_url:
+            cache = RedisMetadataCache(redis_url)
+        elif cache_dir:
+            cache = DiskMetadataCache(cache_dir)
+        else:
+            cache = DiskMetadataCache(DEFAULT_CACHE_DIR, restrict_existing=True)
+    except Exception:
+        cache = None
+
+    _CACHES[loop] = cache
+    return cache
+
+
+def get_token_cache() -> MetadataCache | None:
+    cache = get_metadata_cache()
+    if cache is None or not cache.stores_tokens:
+        return None
+    return cache
+
+
+async def close_metadata_cache() -> None:
+    cache = _CACHES.pop(asyncio.get_running_loop(), None)
+    if cache is not None:
+        await cache.close()
+
+
+async def cache_get_json(
+    cache: MetadataCache | None, prefix: str, ids: list[str]
+) -> dict[str, object]:
+    if cache is None or not ids:
+        return {}
+
+    try:
+        raw_values = await cache.get_many([f"{prefix}:{item_id}" for item_id in ids])
+    except Exception:
+        return {}
+
+    values = {}
+    offset = len(prefix) + 1
+    for key, raw_value in raw_values.items():
+        try:
+            values[key[offset:]] = json.loads(raw_value)
+        except ValueError:
+            continue
+    return values
+
+
+async def cache_set_json(
+    cache: MetadataCache | None,
+    prefix: str,
+    values: dict[str, object],
+    ttl_seconds: int,
+) -> None:
+    if cache is None or not values:
+        return
+
+    items = {f"{prefix}:{item_id}": json.dumps(value) for item_id, value in values.items()}
+    try:
+        await cache.set_many(items, ttl_seconds)
+    except Exception:
+        pass
@@ -1,17 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+import html as html_lib
+import itertools
 import os
 import re
 import time
+import uuid
+import weakref
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import TYPE_CHECKING, Any, TypeVar
 
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import orjson
+from aiolimiter import AsyncLimiter
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import xlsxwriter
+    import xlsxwriter.worksheet
+
+try:
+    from .metadata_cache import (
+        MetadataCache,
+        cache_get_json,
+        cache_set_json,
+        close_metadata_cache,
+        get_metadata_cache,
+        get_token_cache,
+    )
+except ImportError:
+    from metadata_cache import (
+        MetadataCache,
+        cache_get_json,
+        cache_set_json,
+        close_metadata_cache,
+        get_metadata_cache,
+        get_token_cache,
+    )
 
 EMBED_PREFIX = "https://open.spotify.com/embed/track/"
-SPOTIFY_TRACK_API_PREFIX = "https://api.spotify.com/v1/tracks/"
-SPOTIFY_ARTIST_API_PREFIX = "https://api.spotify.com/v1/artists/"
+SPOTIFY_TRACKS_API_URL = "https://api.spotify.com/v1/tracks"
+SPOTIFY_ARTISTS_API_URL = "https://api.spotify.com/v1/artists"
+SPOTIFY_BATCH_SIZE = 50
+SPOTIFY_ID_LENGTH = 22
+WORKBOOK_CHUNK_SIZE = 500
+FILL_COLUMNS = {"Track Name": "track_name", "Artist": "artist"}
+HIDDEN_TEXT_TAGS = frozenset({"script", "style", "template"})
+TRACK_CACHE_TTL_SECONDS = 86400 * 30
+FALLBACK_CACHE_TTL_SECONDS = 3600
+ARTIST_CACHE_TTL_SECONDS = 86400
 SPOTIFY_ACCOUNTS_TOKEN_URL = "https://accounts.spotify.com/api/token"
 SPOTIFY_WEB_TOKEN_URL = (
     "https://open.spotify.com/get_access_token?reason=transport&productType=web_player"
@@ -20,7 +60,29 @@ UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0) "
     "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15"
 )
-DEFAULT_DELAY_SECONDS = 0.2
+DEFAULT_REQUESTS_PER_SECOND = 10
+DEFAULT_CONCURRENCY_PER_HOST = 64
+CONNECTION_POOL_LIMIT = 128
+DNS_CACHE_TTL_SECONDS = 300
+MAX_CONCURRENT_REQUESTS = 64
+MAX_RATE_LIMIT_ATTEMPTS = 3
+MAX_RETRY_AFTER_SECONDS = 30.0
+_REQUEST_LIMITS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, tuple[AsyncLimiter, asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+_SESSIONS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession] = (
+    weakref.WeakKeyDictionary()
+)
+_TOKEN_LOCKS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = (
+    weakref.WeakKeyDictionary()
+)
+_BY_ON_SPOTIFY_RE = re.compile(r"\bby\s+(.+?)\s+on\s+Spotify\b", re.I)
+_NEXT_DATA_RE = re.compile(rb'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>')
+_META_OG_RE = re.compile(
+    rb'<meta[^>]+property="og:(title|description)"[^>]+content="([^"]*)"', re.I
+)
+_ARTIST_HREF_RE = re.compile(rb'href="[^"]*/artist/[^"]*"[^>]*>([^<]+)</a>', re.I)
+T = TypeVar("T")
 _TOKEN_CACHE = {
     "client_credentials": {"token": "", "expires_at": 0.0},
     "web_player": {"token": "", "expires_at": 0.0},
@@ -52,6 +114,81 @@ def _format_duration(duration_ms: int | None) -> str:
     return f"{minutes}:{seconds:02d}"
 
 
+def _request_limits() -> tuple[AsyncLimiter, asyncio.Semaphore]:
+    loop = asyncio.get_running_loop()
+    limits = _REQUEST_LIMITS.get(loop)
+    if limits is None:
+        limits = (
+            AsyncLimiter(DEFAULT_REQUESTS_PER_SECOND, 1),
+            asyncio.Semaphore(MAX_CONCURRENT_REQUESTS),
+        )
+        _REQUEST_LIMITS[loop] = limits
+    return limits
+
+
+def _token_lock() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    lock = _TOKEN_LOCKS.get(loop)
+    if lock is None:
+        lock = asyncio.Lock()
+        _TOKEN_LOCKS[loop] = lock
+    return lock
+
+
+def get_client_session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = _SESSIONS.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_POOL_LIMIT,
+            limit_per_host=DEFAULT_CONCURRENCY_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        _SESSIONS[loop] = session
+    return session
+
+
+async def close_client_session() -> None:
+    session = _SESSIONS.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+def _retry_delay_seconds(retry_after: str | None, attempt: int) -> float:
+    try:
+        delay = float(retry_after) if retry_after else 0.0
+    except ValueError:
+        delay = 0.0
+    if delay <= 0:
+        delay = 0.5 * (2**attempt)
+    return min(delay, MAX_RETRY_AFTER_SECONDS)
+
+
+async def _request(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    timeout: int = 20,
+    **kwargs,
+) -> bytes:
+    limiter, semaphore = _request_limits()
+    for attempt in range(MAX_RATE_LIMIT_ATTEMPTS):
+        async with limiter, semaphore:
+            async with session.request(
+                method,
+                url,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                **kwargs,
+            ) as response:
+                if response.status != 429 or attempt + 1 == MAX_RATE_LIMIT_ATTEMPTS:
+                    response.raise_for_status()
+                    return await response.read()
+                delay = _retry_delay_seconds(response.headers.get("Retry-After"), attempt)
+        await asyncio.sleep(delay)
+    return b""
+
+
 def _dedupe_strings(values: list[str]) -> list[str]:
     deduped = []
     seen = set()
@@ -72,60 +209,131 @@ def track_id_from_url(url: str) -> str | None:
         return None
 
     cleaned = str(url).strip()
-    if not cleaned:
-        return None
-
     if cleaned.startswith("spotify:track:"):
-        parts = cleaned.split(":")
-        return parts[-1] if parts else None
+        track_id = cleaned[14:36]
+    else:
+        index = cleaned.find("/track/")
+        if index < 0:
+            return None
+        track_id = cleaned[index + 7 : index + 29]
 
-    direct_match = re.search(
-        r"open\.spotify\.com/(?:intl-[a-z]{2}/)?(?:embed/)?track/([A-Za-z0-9]+)",
-        cleaned,
-    )
-    if direct_match:
-        return direct_match.group(1)
+    if len(track_id) == SPOTIFY_ID_LENGTH and track_id.isascii() and track_id.isalnum():
+        return track_id
+    return None
+
+
+def _decode_html_fragment(value: bytes) -> str:
+    return html_lib.unescape(value.decode("utf-8", errors="replace")).strip()
+
+
+def _artists_from_description(description: str, track_name: str | None) -> str | None:
+    by_match = _BY_ON_SPOTIFY_RE.search(description)
+    if by_match:
+        return by_match.group(1).strip()
+
+    parts = [part.strip() for part in description.split("·") if part.strip()]
+    if len(parts) >= 2:
+        return parts[1]
+    if len(parts) == 1 and track_name and parts[0].lower() != track_name.lower():
+        return parts[0]
+    return None
+
+
+def _metadata_from_next_data(html: bytes) -> dict[str, str] | None:
+    match = _NEXT_DATA_RE.search(html)
+    if not match:
+        return None
 
     try:
-        parsed = urlparse(cleaned)
-    except Exception:
+        data = orjson.loads(match.group(1))
+        entity = data["props"]["pageProps"]["state"]["data"]["entity"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(entity, dict):
         return None
 
-    path_parts = [segment for segment in parsed.path.split("/") if segment]
-    if "track" in path_parts:
-        track_index = path_parts.index("track")
-        if track_index + 1 < len(path_parts):
-            return path_parts[track_index + 1]
-    return None
+    artists = [
+        str(artist.get("name") or "")
+        for artist in entity.get("artists") or []
+        if isinstance(artist, dict)
+    ]
 
+    release_date = entity.get("releaseDate")
+    if isinstance(release_date, dict):
+        release_date = release_date.get("isoString")
+    release_date = str(release_date or "").strip()[:10]
 
-def _extract_track_artist_from_html(html: str) -> tuple[str | None, str | None]:
-    soup = BeautifulSoup(html, "html.parser")
+    explicit_value = entity.get("isExplicit")
+    if isinstance(explicit_value, bool):
+        explicit = "Yes" if explicit_value else "No"
+    else:
+        explicit = ""
+
+    metadata = _blank_metadata()
+    metadata["track_name"] = str(entity.get("name") or entity.get("title") or "").strip()
+    metadata["artist"] = ", ".join(_dedupe_strings(artists))
+    metadata["release_date"] = release_date
+    metadata["duration"] = _format_duration(entity.get("duration"))
+    metadata["explicit"] = explicit
+    return metadata
 
-    def meta_content(name: str) -> str | None:
-        tag = soup.find("meta", attrs={"property": name})
-        if not tag:
-            return None
-        value = str(tag.get("content", "")).strip()
-        return value or None
 
-    track_name = meta_content("og:title")
-    description = meta_content("og:description")
+def _extract_track_artist_regex(html: bytes) -> tuple[str | None, str | None]:
+    og_values: dict[bytes, bytes] = {}
+    for match in _META_OG_RE.finditer(html):
+        og_values.setdefault(match.group(1).lower(), match.group(2))
+        if len(og_values) == 2:
+            break
+
+    track_name = _decode_html_fragment(og_values.get(b"title", b""))
+    description = _decode_html_fragment(og_values.get(b"description", b""))
 
     artists = None
     if description:
-        by_match = re.search(r"\bby\s+(.+?)\s+on\s+Spotify\b", description, re.I)
-        if by_match:
-            artists = by_match.group(1).strip()
-        else:
-            parts = [part.strip() for part in description.split("·") if part.strip()]
-            if len(parts) >= 2:
-                artists = parts[1]
-            elif len(parts) == 1 and track_name and parts[0].lower() != track_name.lower():
-                artists = parts[0]
+        artists = _artists_from_description(description, track_name or None)
+
+    if not artists:
+        artist_links = _dedupe_strings(
+            [_decode_html_fragment(match) for match in _ARTIST_HREF_RE.findall(html)]
+        )
+        artists = ", ".join(artist_links) if artist_links else None
+
+    return track_name or None, artists
 
-    page_text = soup.get_text("\n", strip=True)
-    lines = [line.strip() for line in page_text.split("\n") if line.strip()]
+
+def _extract_track_artist_from_html(
+    html: str | bytes,
+) -> tuple[str | None, str | None]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    meta_properties: dict[str, str] = {}
+    artist_anchors = []
+    lines = []
+
+    if tree.root is not None:
+        for node in tree.root.traverse(include_text=True):
+            tag = node.tag
+            if tag == "-text":
+                if node.parent is not None and node.parent.tag in HIDDEN_TEXT_TAGS:
+                    continue
+                for line in (node.text_content or "").split("\n"):
+                    line = line.strip()
+                    if line:
+                        lines.append(line)
+            elif tag == "meta":
+                name = node.attributes.get("property")
+                if name:
+                    meta_properties.setdefault(
+                        name, str(node.attributes.get("content") or "").strip()
+                    )
+            elif tag == "a" and "/artist/" in str(node.attributes.get("href") or ""):
+                artist_anchors.append(node)
+
+    track_name = meta_properties.get("og:title") or None
+    description = meta_properties.get("og:description") or None
+
+    artists = _artists_from_description(description, track_name) if description else None
 
     if not track_name:
         for line in lines:
@@ -142,19 +350,13 @@ def _extract_track_artist_from_html(html: str) -> tuple[str | None, str | None]:
             break
 
     if not artists:
-        artist_links = []
-        for anchor in soup.find_all("a", href=True):
-            href = str(anchor.get("href", ""))
-            if "/artist/" not in href:
-                continue
-            text = anchor.get_text(strip=True)
-            if not text:
-                continue
-            artist_links.append(text)
+        artist_links = [anchor.text(strip=True) for anchor in artist_anchors]
 
         deduped = []
         seen = set()
         for artist in artist_links:
+            if not artist:
+                continue
             key = artist.lower()
             if key in seen:
                 continue
@@ -166,8 +368,40 @@ def _extract_track_artist_from_html(html: str) -> tuple[str | None, str | None]:
     return track_name, artists
 
 
-def _get_client_credentials_token(
-    session: requests.Session, timeout: int = 20, force_refresh: bool = False
+async def _load_shared_token(cache: dict, shared_key: str, now: float) -> str | None:
+    shared_tokens = await cache_get_json(get_token_cache(), "token", [shared_key])
+    shared = shared_tokens.get(shared_key)
+    if not isinstance(shared, dict):
+        return None
+
+    token = str(shared.get("token") or "").strip()
+    expires_at = shared.get("expires_at")
+    if not token or not isinstance(expires_at, (int, float)):
+        return None
+    if now >= (float(expires_at) - 30):
+        return None
+
+    cache["token"] = token
+    cache["expires_at"] = float(expires_at)
+    return token
+
+
+async def _store_shared_token(
+    shared_key: str, token: str, expires_at: float, now: float
+) -> None:
+    ttl_seconds = int(expires_at - now)
+    if ttl_seconds <= 0:
+        return
+    await cache_set_json(
+        get_token_cache(),
+        "token",
+        {shared_key: {"token": token, "expires_at": expires_at}},
+        ttl_seconds,
+    )
+
+
+async def _get_client_credentials_token(
+    session: aiohttp.ClientSession, timeout: int = 20, force_refresh: bool = False
 ) -> str:
     client_id = str(os.getenv("SPOTIFY_CLIENT_ID") or "").strip()
     client_secret = str(os.getenv("SPOTIFY_CLIENT_SECRET") or "").strip()
@@ -178,19 +412,25 @@ def _get_client_credentials_token(
 
     now = time.time()
     cache = _TOKEN_CACHE["client_credentials"]
-    if not force_refresh and cache["token"] and now < (cache["expires_at"] - 30):
-        return str(cache["token"])
-
-    response = session.post(
+    shared_key = f"cc:{client_id[:8]}"
+    if not force_refresh:
+        if cache["token"] and now < (cache["expires_at"] - 30):
+            return str(cache["token"])
+        shared_token = await _load_shared_token(cache, shared_key, now)
+        if shared_token:
+            return shared_token
+
+    body = await _request(
+        session,
+        "POST",
         SPOTIFY_ACCOUNTS_TOKEN_URL,
+        timeout=timeout,
         data={"grant_type": "client_credentials"},
-        auth=(client_id, client_secret),
+        auth=aiohttp.BasicAuth(client_id, client_secret),
         headers={"User-Agent": UA},
-        timeout=timeout,
     )
-    response.raise_for_status()
 
-    payload = response.json()
+    payload = orjson.loads(body)
     token = str(payload.get("access_token") or "").strip()
     if not token:
         raise ValueError("Spotify client-credentials token was missing in response.")
@@ -203,25 +443,32 @@ def _get_client_credentials_token(
 
     cache["token"] = token
     cache["expires_at"] = expires_at
+    await _store_shared_token(shared_key, token, expires_at, now)
     return token
 
 
-def _get_web_player_token(
-    session: requests.Session, timeout: int = 20, force_refresh: bool = False
+async def _get_web_player_token(
+    session: aiohttp.ClientSession, timeout: int = 20, force_refresh: bool = False
 ) -> str:
     now = time.time()
     cache = _TOKEN_CACHE["web_player"]
-    if not force_refresh and cache["token"] and now < (cache["expires_at"] - 30):
-        return str(cache["token"])
-
-    response = session.get(
+    shared_key = "web"
+    if not force_refresh:
+        if cache["token"] and now < (cache["expires_at"] - 30):
+            return str(cache["token"])
+        shared_token = await _load_shared_token(cache, shared_key, now)
+        if shared_token:
+            return shared_token
+
+    body = await _request(
+        session,
+        "GET",
         SPOTIFY_WEB_TOKEN_URL,
-        headers={"User-Agent": UA, "Accept": "application/json"},
         timeout=timeout,
+        headers={"User-Agent": UA, "Accept": "application/json"},
     )
-    response.raise_for_status()
 
-    payload = response.json()
+    payload = orjson.loads(body)
     token = str(payload.get("accessToken") or "").strip()
     if not token:
         raise ValueError("Spotify web access token was missing in response.")
@@ -234,223 +481,628 @@ def _get_web_player_token(
 
     cache["token"] = token
     cache["expires_at"] = expires_at
+    await _store_shared_token(shared_key, token, expires_at, now)
     return token
 
 
-def _get_spotify_access_token(
-    session: requests.Session, timeout: int = 20, force_refresh: bool = False
+async def _get_spotify_access_token(
+    session: aiohttp.ClientSession, timeout: int = 20, force_refresh: bool = False
 ) -> str:
     errors = []
     providers = [_get_client_credentials_token, _get_web_player_token]
-    for provider in providers:
-        try:
-            return provider(session=session, timeout=timeout, force_refresh=force_refresh)
-        except Exception as exc:
-            errors.append(f"{provider.__name__}: {exc}")
+    async with _token_lock():
+        for provider in providers:
+            try:
+                return await provider(
+                    session=session, timeout=timeout, force_refresh=force_refresh
+                )
+            except Exception as exc:
+                errors.append(f"{provider.__name__}: {exc}")
 
     joined = " | ".join(errors) if errors else "No token providers available."
     raise RuntimeError(f"Unable to obtain Spotify token. {joined}")
 
 
-def _spotify_api_get(
-    session: requests.Session, url: str, timeout: int = 20
+async def _spotify_api_get(
+    session: aiohttp.ClientSession, url: str, timeout: int = 20
 ) -> dict:
-    response = None
     last_error = None
     for attempt in range(2):
         try:
-            token = _get_spotify_access_token(
+            token = await _get_spotify_access_token(
                 session=session, timeout=timeout, force_refresh=(attempt == 1)
             )
         except Exception as exc:
             last_error = exc
             continue
 
-        response = session.get(
-            url,
-            headers={"Authorization": f"Bearer {token}", "User-Agent": UA},
-            timeout=timeout,
-        )
-        if response.status_code == 401 and attempt == 0:
-            continue
-        response.raise_for_status()
-        data = response.json()
+        try:
+            body = await _request(
+                session,
+                "GET",
+                url,
+                timeout=timeout,
+                headers={"Authorization": f"Bearer {token}", "User-Agent": UA},
+            )
+        except aiohttp.ClientResponseError as exc:
+            if exc.status == 401 and attempt == 0:
+                continue
+            raise
+        data = orjson.loads(body)
         return data if isinstance(data, dict) else {}
 
-    if response is not None:
-        response.raise_for_status()
     if last_error is not None:
         raise last_error
     return {}
 
 
-def fetch_track_artist(
-    spotify_url: str, session: requests.Session, timeout: int = 20
-) -> tuple[str | None, str | None]:
+async def fetch_embed_metadata(
+    spotify_url: str, session: aiohttp.ClientSession, timeout: int = 20
+) -> dict[str, str]:
+    metadata = _blank_metadata()
     track_id = track_id_from_url(spotify_url)
     if not track_id:
-        return None, None
+        return metadata
 
     embed_url = f"{EMBED_PREFIX}{track_id}"
-    response = session.get(embed_url, headers={"User-Agent": UA}, timeout=timeout)
-    response.raise_for_status()
-    return _extract_track_artist_from_html(response.text)
+    body = await _request(
+        session, "GET", embed_url, timeout=timeout, headers={"User-Agent": UA}
+    )
 
+    next_data_metadata = _metadata_from_next_data(body)
+    if next_data_metadata and (
+        next_data_metadata["track_name"] or next_data_metadata["artist"]
+    ):
+        return next_data_metadata
+
+    track_name, artists = _extract_track_artist_regex(body)
+    if not (track_name and artists):
+        track_name, artists = _extract_track_artist_from_html(body)
+    metadata["track_name"] = track_name or ""
+    metadata["artist"] = artists or ""
+    return metadata
 
-def fetch_track_metadata(
-    spotify_url: str,
-    session: requests.Session,
-    artist_genre_cache: dict[str, list[str]],
+
+async def fetch_track_artist(
+    spotify_url: str, session: aiohttp.ClientSession, timeout: int = 20
+) -> tuple[str | None, str | None]:
+    metadata = await fetch_embed_metadata(spotify_url, session, timeout=timeout)
+    return metadata["track_name"] or None, metadata["artist"] or None
+
+
+def _chunked(values: list[str], size: int = SPOTIFY_BATCH_SIZE) -> list[list[str]]:
+    return [values[index : index + size] for index in range(0, len(values), size)]
+
+
+def _track_artist_ids(track_payload: dict) -> list[str]:
+    artist_ids = []
+    for artist_entry in track_payload.get("artists") or []:
+        if not isinstance(artist_entry, dict):
+            continue
+        artist_id = str(artist_entry.get("id") or "").strip()
+        if artist_id:
+            artist_ids.append(artist_id)
+    return artist_ids
+
+
+async def _fetch_tracks(
+    session: aiohttp.ClientSession, track_ids: list[str], timeout: int = 20
+) -> dict[str, dict]:
+    chunks = _chunked(track_ids)
+    payloads = await asyncio.gather(
+        *[
+            _spotify_api_get(
+                session, f"{SPOTIFY_TRACKS_API_URL}?ids={','.join(chunk)}", timeout=timeout
+            )
+            for chunk in chunks
+        ],
+        return_exceptions=True,
+    )
+
+    tracks = {}
+    for chunk, payload in zip(chunks, payloads):
+        if isinstance(payload, BaseException):
+            continue
+        for track_id, track_payload in zip(chunk, payload.get("tracks") or []):
+            if isinstance(track_payload, dict):
+                tracks[track_id] = track_payload
+    return tracks
+
+
+async def _fetch_artist_genres(
+    session: aiohttp.ClientSession, artist_ids: list[str], timeout: int = 20
+) -> dict[str, list[str]]:
+    chunks = _chunked(artist_ids)
+    payloads = await asyncio.gather(
+        *[
+            _spotify_api_get(
+                session, f"{SPOTIFY_ARTISTS_API_URL}?ids={','.join(chunk)}", timeout=timeout
+            )
+            for chunk in chunks
+        ],
+        return_exceptions=True,
+    )
+
+    artist_genres: dict[str, list[str]] = {}
+    for chunk, payload in zip(chunks, payloads):
+        if isinstance(payload, BaseException):
+            continue
+        for artist_id, artist_payload in zip(chunk, payload.get("artists") or []):
+            if not isinstance(artist_payload, dict):
+                continue
+            raw_genres = artist_payload.get("genres") or []
+            artist_genres[artist_id] = _dedupe_strings([str(genre) for genre in raw_genres])
+    return artist_genres
+
+
+async def _load_artist_genres(
+    session: aiohttp.ClientSession,
+    cache: MetadataCache | None,
+    artist_ids: list[str],
     timeout: int = 20,
+) -> dict[str, list[str]]:
+    artist_genres = await cache_get_json(cache, "a", artist_ids)
+    missing_artist_ids = [
+        artist_id for artist_id in artist_ids if artist_id not in artist_genres
+    ]
+    if missing_artist_ids:
+        fetched = await _fetch_artist_genres(session, missing_artist_ids, timeout=timeout)
+        await cache_set_json(cache, "a", fetched, ARTIST_CACHE_TTL_SECONDS)
+        artist_genres.update(fetched)
+    return artist_genres
+
+
+def _cacheable_metadata(metadata: dict) -> dict[str, str] | None:
+    if not (metadata.get("track_name") or metadata.get("artist")):
+        return None
+    return {key: str(metadata.get(key) or "") for key in _blank_metadata()}
+
+
+def _metadata_from_track(
+    track_payload: dict, artist_genres: dict[str, list[str]]
 ) -> dict[str, str]:
     metadata = _blank_metadata()
+    track_name = str(track_payload.get("name") or "").strip()
+    artists = []
+    genres = []
 
-    track_id = track_id_from_url(spotify_url)
-    if not track_id:
-        return metadata
-
-    try:
-        track_payload = _spotify_api_get(
-            session, f"{SPOTIFY_TRACK_API_PREFIX}{track_id}", timeout=timeout
-        )
-        track_name = str(track_payload.get("name") or "").strip()
-        artists_data = track_payload.get("artists") or []
-        artists = []
-        genres = []
+    for artist_entry in track_payload.get("artists") or []:
+        if not isinstance(artist_entry, dict):
+            continue
 
-        for artist_entry in artists_data:
-            if not isinstance(artist_entry, dict):
-                continue
+        artist_name = str(artist_entry.get("name") or "").strip()
+        if artist_name:
+            artists.append(artist_name)
 
-            artist_name = str(artist_entry.get("name") or "").strip()
-            if artist_name:
-                artists.append(artist_name)
+        artist_id = str(artist_entry.get("id") or "").strip()
+        if artist_id:
+            genres.extend(artist_genres.get(artist_id) or [])
 
-            artist_id = str(artist_entry.get("id") or "").strip()
-            if not artist_id:
-                continue
+    album_data = track_payload.get("album")
+    album_data = album_data if isinstance(album_data, dict) else {}
 
-            if artist_id not in artist_genre_cache:
-                try:
-                    artist_payload = _spotify_api_get(
-                        session, f"{SPOTIFY_ARTIST_API_PREFIX}{artist_id}", timeout=timeout
-                    )
-                    raw_genres = artist_payload.get("genres") or []
-                    artist_genre_cache[artist_id] = _dedupe_strings(
-                        [str(genre) for genre in raw_genres]
-                    )
-                except Exception:
-                    artist_genre_cache[artist_id] = []
+    explicit_value = track_payload.get("explicit")
+    if isinstance(explicit_value, bool):
+        explicit = "Yes" if explicit_value else "No"
+    else:
+        explicit = ""
 
-            genres.extend(artist_genre_cache[artist_id])
+    popularity_value = track_payload.get("popularity")
+    popularity = (
+        str(popularity_value)
+        if isinstance(popularity_value, int)
+        else ""
+    )
 
-        album_data = track_payload.get("album")
-        album_data = album_data if isinstance(album_data, dict) else {}
+    metadata["track_name"] = track_name
+    metadata["artist"] = ", ".join(_dedupe_strings(artists))
+    metadata["genre"] = ", ".join(_dedupe_strings(genres))
+    metadata["album"] = str(album_data.get("name") or "").strip()
+    metadata["release_date"] = str(album_data.get("release_date") or "").strip()
+    metadata["duration"] = _format_duration(track_payload.get("duration_ms"))
+    metadata["explicit"] = explicit
+    metadata["popularity"] = popularity
+    return metadata
 
-        explicit_value = track_payload.get("explicit")
-        if isinstance(explicit_value, bool):
-            explicit = "Yes" if explicit_value else "No"
-        else:
-            explicit = ""
 
-        popularity_value = track_payload.get("popularity")
-        popularity = (
-            str(popularity_value)
-            if isinstance(popularity_value, int)
-            else ""
-        )
+async def _metadata_with_fallback(
+    spotify_url: str,
+    session: aiohttp.ClientSession,
+    track_payload: dict | None,
+    artist_genres: dict[str, list[str]],
+    timeout: int = 20,
+) -> tuple[dict[str, str], bool]:
+    metadata = _blank_metadata()
 
-        metadata["track_name"] = track_name
-        metadata["artist"] = ", ".join(_dedupe_strings(artists))
-        metadata["genre"] = ", ".join(_dedupe_strings(genres))
-        metadata["album"] = str(album_data.get("name") or "").strip()
-        metadata["release_date"] = str(album_data.get("release_date") or "").strip()
-        metadata["duration"] = _format_duration(track_payload.get("duration_ms"))
-        metadata["explicit"] = explicit
-        metadata["popularity"] = popularity
-
-        if metadata["track_name"] or metadata["artist"] or metadata["genre"]:
-            return metadata
-    except Exception:
-        pass
+    if track_payload:
+        try:
+            metadata = _metadata_from_track(track_payload, artist_genres)
+            if metadata["track_name"] or metadata["artist"] or metadata["genre"]:
+                return metadata, True
+        except Exception:
+            pass
 
     try:
-        fallback_track, fallback_artist = fetch_track_artist(
+        fallback = await fetch_embed_metadata(
             spotify_url=spotify_url,
             session=session,
             timeout=timeout,
         )
-        metadata["track_name"] = fallback_track or ""
-        metadata["artist"] = fallback_artist or ""
+        metadata["track_name"] = fallback["track_name"]
+        metadata["artist"] = fallback["artist"]
+        for key in ("release_date", "duration", "explicit"):
+            metadata[key] = metadata[key] or fallback[key]
     except Exception:
         pass
 
+    return metadata, False
+
+
+async def fetch_track_metadata(
+    spotify_url: str,
+    session: aiohttp.ClientSession,
+    artist_genre_cache: dict[str, list[str]],
+    timeout: int = 20,
+) -> dict[str, str]:
+    track_id = track_id_from_url(spotify_url)
+    if not track_id:
+        return _blank_metadata()
+
+    cache = get_metadata_cache()
+    cached_metadata = await cache_get_json(cache, "t", [track_id])
+    if track_id in cached_metadata:
+        return {**_blank_metadata(), **cached_metadata[track_id]}
+
+    tracks = await _fetch_tracks(session, [track_id], timeout=timeout)
+    track_payload = tracks.get(track_id)
+    if track_payload:
+        missing_artist_ids = [
+            artist_id
+            for artist_id in _track_artist_ids(track_payload)
+            if artist_id not in artist_genre_cache
+        ]
+        if missing_artist_ids:
+            artist_genre_cache.update(
+                await _load_artist_genres(
+                    session, cache, missing_artist_ids, timeout=timeout
+                )
+            )
+
+    metadata, from_api = await _metadata_with_fallback(
+        spotify_url,
+        session,
+        track_payload,
+        artist_genre_cache,
+        timeout=timeout,
+    )
+    cacheable = _cacheable_metadata(metadata)
+    if cacheable:
+        ttl_seconds = (
+            TRACK_CACHE_TTL_SECONDS if from_api else FALLBACK_CACHE_TTL_SECONDS
+        )
+        await cache_set_json(cache, "t", {track_id: cacheable}, ttl_seconds)
     return metadata
 
 
-def fill_rows(urls: list[str], delay_seconds: float = DEFAULT_DELAY_SECONDS) -> list[dict]:
-    session = requests.Session()
-    artist_genre_cache: dict[str, list[str]] = {}
-    output_rows = []
-    total = len(urls)
+async def _track_metadata_entry(
+    track_id: str,
+    spotify_url: str,
+    session: aiohttp.ClientSession,
+    track_payload: dict | None,
+    artist_genres: dict[str, list[str]],
+) -> tuple[str, dict[str, str], bool]:
+    try:
+        metadata, from_api = await _metadata_with_fallback(
+            spotify_url, session, track_payload, artist_genres
+        )
+    except Exception:
+        metadata, from_api = _blank_metadata(), False
+    return track_id, metadata, from_api
 
-    for index, value in enumerate(urls, start=1):
-        url = str(value or "").strip()
-        if not url:
-            output_rows.append({"url": "", **_blank_metadata()})
-            continue
 
-        metadata = fetch_track_metadata(
-            spotify_url=url,
-            session=session,
-            artist_genre_cache=artist_genre_cache,
+async def iter_fill_rows(urls: Iterable[str]) -> AsyncIterator[tuple[int, dict]]:
+    cleaned_urls = [str(value or "").strip() for value in urls]
+    positions_by_track_id: dict[str, list[int]] = {}
+    for index, url in enumerate(cleaned_urls):
+        track_id = track_id_from_url(url)
+        if track_id:
+            positions_by_track_id.setdefault(track_id, []).append(index)
+        else:
+            yield index, {"url": url, **_blank_metadata()}
+
+    unique_track_ids = list(positions_by_track_id)
+    cache = get_metadata_cache()
+    session = get_client_session()
+
+    cached_metadata = await cache_get_json(cache, "t", unique_track_ids)
+    for track_id, metadata in cached_metadata.items():
+        for index in positions_by_track_id[track_id]:
+            yield index, {"url": cleaned_urls[index], **_blank_metadata(), **metadata}
+
+    missing_track_ids = [
+        track_id for track_id in unique_track_ids if track_id not in cached_metadata
+    ]
+    tracks = await _fetch_tracks(session, missing_track_ids)
+    artist_ids = list(
+        dict.fromkeys(
+            artist_id
+            for track_payload in tracks.values()
+            for artist_id in _track_artist_ids(track_payload)
         )
+    )
+    artist_genres = await _load_artist_genres(session, cache, artist_ids)
+
+    tasks = [
+        asyncio.create_task(
+            _track_metadata_entry(
+                track_id,
+                cleaned_urls[positions_by_track_id[track_id][0]],
+                session,
+                tracks.get(track_id),
+                artist_genres,
+            )
+        )
+        for track_id in missing_track_ids
+    ]
+    fresh_metadata = {}
+    fallback_metadata = {}
+    try:
+        for next_entry in asyncio.as_completed(tasks):
+            track_id, metadata, from_api = await next_entry
+            cacheable = _cacheable_metadata(metadata)
+            if cacheable:
+                target = fresh_metadata if from_api else fallback_metadata
+                target[track_id] = cacheable
+            for index in positions_by_track_id[track_id]:
+                yield index, {"url": cleaned_urls[index], **metadata}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    await cache_set_json(cache, "t", fresh_metadata, TRACK_CACHE_TTL_SECONDS)
+    await cache_set_json(cache, "t", fallback_metadata, FALLBACK_CACHE_TTL_SECONDS)
+
+
+async def fill_rows_async(urls: Iterable[str]) -> list[dict]:
+    cleaned_urls = [str(value or "").strip() for value in urls]
+    output_rows: list[dict] = [{} for _ in cleaned_urls]
+    async for index, row in iter_fill_rows(cleaned_urls):
+        output_rows[index] = row
+    return output_rows
 
-        output_rows.append({"url": url, **metadata})
 
-        if delay_seconds > 0 and index < total:
-            time.sleep(delay_seconds)
+async def _fill_rows_and_close(urls: Iterable[str]) -> list[dict]:
+    try:
+        return await fill_rows_async(urls)
+    finally:
+        await close_client_session()
+        await close_metadata_cache()
 
-    return output_rows
+
+def _run_sync(coroutine: Coroutine[Any, Any, T]) -> T:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def fill_rows(urls: Iterable[str]) -> list[dict]:
+    return _run_sync(_fill_rows_and_close(urls))
 
 
 def fill_dataframe(df: pd.DataFrame, url_column: str = "Spotify URL") -> pd.DataFrame:
     import pandas as pd
 
-    if url_column not in df.columns:
-        if "URL" in df.columns:
-            url_column = "URL"
-        else:
+    url_index = _resolve_url_column(list(df.columns), url_column)
+    urls = df.iloc[:, url_index].fillna("").astype(str)
+    result_df = pd.DataFrame(fill_rows(urls), columns=list(FILL_COLUMNS.values()))
+
+    return df.assign(
+        **{
+            column: result_df[key].to_numpy()
+            for column, key in FILL_COLUMNS.items()
+        }
+    )
+
+
+def _resolve_url_column(columns: list, url_column: str) -> int:
+    names = [str(column) for column in columns]
+    if url_column in names:
+        return names.index(url_column)
+    if "URL" in names:
+        return names.index("URL")
+    raise ValueError(f'Expected column "{url_column}" (or fallback "URL") in input data.')
+
+
+def _fill_column_indices(columns: list) -> tuple[list, dict[int, str]]:
+    output_columns = list(columns)
+    for column in FILL_COLUMNS:
+        if column not in output_columns:
+            output_columns.append(column)
+    fill_indices = {
+        output_columns.index(column): key for column, key in FILL_COLUMNS.items()
+    }
+    return output_columns, fill_indices
+
+
+def _open_output_workbook(
+    output_path: Path, sheet_name: str, columns: list
+) -> tuple[xlsxwriter.Workbook, xlsxwriter.worksheet.Worksheet]:
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(
+        str(output_path),
+        {
+            "constant_memory": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            "remove_timezone": True,
+            "strings_to_urls": False,
+        },
+    )
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({"bold": True, "border": 1})
+    worksheet.write_row(0, 0, [str(column) for column in columns], header_format)
+    return workbook, worksheet
+
+
+def _iter_sheet_rows(input_path: Path, sheet_name: str) -> Iterator[tuple]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(input_path, read_only=True, data_only=True)
+    try:
+        yield from workbook[sheet_name].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+async def _finish_in_thread(func: Callable[..., T], *args: Any) -> T:
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait({future})
+        raise
+
+
+def _temp_output_path(output_path: Path) -> Path:
+    return output_path.with_name(f".{output_path.stem}.{uuid.uuid4().hex[:8]}.xlsx")
+
+
+def _write_rows(
+    worksheet: xlsxwriter.worksheet.Worksheet, first_row: int, rows: list[list]
+) -> None:
+    for row_index, row in enumerate(rows, start=first_row):
+        error = worksheet.write_row(row_index, 0, row)
+        if error:
             raise ValueError(
-                f'Expected column "{url_column}" (or fallback "URL") in input data.'
+                f"Failed to write row {row_index + 1} of the output sheet "
+                f"(xlsxwriter error {error})."
             )
 
-    urls = df[url_column].fillna("").astype(str).tolist()
-    filled_rows = fill_rows(urls)
 
-    out = df.copy()
-    out["Track Name"] = [row["track_name"] for row in filled_rows]
-    out["Artist"] = [row["artist"] for row in filled_rows]
-    return out
+async def _write_output_workbook(
+    rows: Iterator[tuple],
+    output_path: Path,
+    sheet_name: str,
+    output_columns: list,
+    url_index: int,
+    fill_indices: dict[int, str],
+    chunk_size: int,
+) -> None:
+    workbook, worksheet = await _finish_in_thread(
+        _open_output_workbook, output_path, sheet_name, output_columns
+    )
+    read_queue: asyncio.Queue[list[tuple] | None] = asyncio.Queue(maxsize=2)
+    write_queue: asyncio.Queue[list[list] | None] = asyncio.Queue(maxsize=2)
 
+    async def read_chunks() -> None:
+        while True:
+            chunk = await _finish_in_thread(
+                lambda: list(itertools.islice(rows, chunk_size))
+            )
+            if not chunk:
+                break
+            await read_queue.put(chunk)
+        await read_queue.put(None)
+
+    async def fill_chunks() -> None:
+        while (chunk := await read_queue.get()) is not None:
+            urls = [row[url_index] if url_index < len(row) else "" for row in chunk]
+            filled_rows = await fill_rows_async(urls)
+
+            output_rows = []
+            for row, filled in zip(chunk, filled_rows):
+                output_row = list(row) + [""] * (len(output_columns) - len(row))
+                for index, key in fill_indices.items():
+                    output_row[index] = filled[key]
+                output_rows.append(output_row)
+            await write_queue.put(output_rows)
+        await write_queue.put(None)
+
+    async def write_chunks() -> None:
+        next_row = 1
+        while (output_rows := await write_queue.get()) is not None:
+            await _finish_in_thread(_write_rows, worksheet, next_row, output_rows)
+            next_row += len(output_rows)
+
+    tasks = [
+        asyncio.create_task(read_chunks()),
+        asyncio.create_task(fill_chunks()),
+        asyncio.create_task(write_chunks()),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await _finish_in_thread(workbook.close)
 
-def process_workbook(
+
+async def process_workbook_async(
     input_path: str | Path,
     output_path: str | Path | None = None,
     sheet_name: str = "Tracks",
     url_column: str = "Spotify URL",
+    chunk_size: int = WORKBOOK_CHUNK_SIZE,
 ) -> Path:
-    import pandas as pd
-
     input_path = Path(input_path)
     if output_path is None:
         output_path = input_path.with_name(f"{input_path.stem}_with_metadata.xlsx")
-
-    df = pd.read_excel(input_path, sheet_name=sheet_name)
-    filled_df = fill_dataframe(df, url_column=url_column)
-
     output_path = Path(output_path)
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        filled_df.to_excel(writer, index=False, sheet_name=sheet_name)
+
+    rows = _iter_sheet_rows(input_path, sheet_name)
+    try:
+        header = [
+            "" if column is None else column
+            for column in await _finish_in_thread(next, rows, ())
+        ]
+        url_index = _resolve_url_column(header, url_column)
+        output_columns, fill_indices = _fill_column_indices(header)
+
+        temp_path = _temp_output_path(output_path)
+        try:
+            await _write_output_workbook(
+                rows,
+                temp_path,
+                sheet_name,
+                output_columns,
+                url_index,
+                fill_indices,
+                chunk_size,
+            )
+            os.replace(temp_path, output_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+    finally:
+        rows.close()
 
     return output_path
+
+
+async def _process_workbook_and_close(**kwargs) -> Path:
+    try:
+        return await process_workbook_async(**kwargs)
+    finally:
+        await close_client_session()
+        await close_metadata_cache()
+
+
+def process_workbook(
+    input_path: str | Path,
+    output_path: str | Path | None = None,
+    sheet_name: str = "Tracks",
+    url_column: str = "Spotify URL",
+) -> Path:
+    return _run_sync(
+        _process_workbook_and_close(
+            input_path=input_path,
+            output_path=output_path,
+            sheet_name=sheet_name,
+            url_column=url_column,
+        )
+    )
@@ -150,41 +150,44 @@ function App() {
       let failed = 0;
       let firstErrorMessage = "";
 
-      for (const target of targets) {
+      const response = await fetch(`${fillApiEndpoint}/stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ urls: targets.map((target) => target.url) })
+      });
+
+      if (!response.ok || !response.body) {
+        let detail = "";
         try {
-          const response = await fetch(fillApiEndpoint, {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ urls: [target.url] })
-          });
-
-          if (!response.ok) {
-            let detail = "";
-            try {
-              const errorPayload = await response.json();
-              detail = errorPayload?.detail
-                ? `: ${String(errorPayload.detail)}`
-                : "";
-            } catch {
-              detail = "";
-            }
-            throw new Error(
-              `Backend request failed (${response.status})${detail}`
-            );
-          }
+          const errorPayload = await response.json();
+          detail = errorPayload?.detail
+            ? `: ${String(errorPayload.detail)}`
+            : "";
+        } catch {
+          detail = "";
+        }
+        throw new Error(`Backend request failed (${response.status})${detail}`);
+      }
 
-          const payload = await response.json();
-          const apiRow = payload.rows?.[0];
+      const applyStreamLine = (line) => {
+        if (!line.trim()) {
+          return;
+        }
 
-          if (apiRow) {
-            nextRows[target.index] = {
-              url: apiRow.url ?? nextRows[target.index].url,
-              artist: apiRow.artist ?? nextRows[target.index].artist,
-              trackName: apiRow.track_name ?? nextRows[target.index].trackName
-            };
+        try {
+          const apiRow = JSON.parse(line);
+          const target = targets[apiRow.index];
+          if (!target) {
+            return;
           }
 
-          if (apiRow && (apiRow.artist || apiRow.track_name)) {
+          nextRows[target.index] = {
+            url: apiRow.url || nextRows[target.index].url,
+            artist: apiRow.artist ?? nextRows[target.index].artist,
+            trackName: apiRow.track_name ?? nextRows[target.index].trackName
+          };
+
+          if (apiRow.artist || apiRow.track_name) {
             updated += 1;
           } else {
             failed += 1;
@@ -193,19 +196,37 @@ function App() {
           failed += 1;
           if (!firstErrorMessage) {
             firstErrorMessage =
-              error instanceof Error
-                ? error.message
-                : "Unknown request error";
+              error instanceof Error ? error.message : "Unknown stream error";
           }
         }
 
         completed += 1;
+      };
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        buffered += decoder.decode(value ?? new Uint8Array(), { stream: !done });
+
+        const lines = buffered.split("\n");
+        buffered = done ? "" : lines.pop();
+        lines.forEach(applyStreamLine);
+
         setRows([...nextRows]);
         setStatus(
           `Filling metadata: ${completed}/${targets.length} completed (${updated} updated, ${failed} failed).`
         );
+
+        if (done) {
+          break;
+        }
       }
 
+      failed += targets.length - completed;
+
       const summary = `Done. Processed ${targets.length} URL(s): ${updated} updated, ${failed} failed.`;
       if (updated === 0 && failed > 0 && firstErrorMessage) {
         setStatus(`${summary} First error: ${firstErrorMessage}`);
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import stat
+
+from backend import metadata_cache
+
+
+def _mode(path) -> int:
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+def _token_cache_for(monkeypatch, cache_dir: str) -> tuple[object, object]:
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.setenv("SPOTIFY_CACHE_DIR", cache_dir)
+
+    async def load() -> tuple[object, object]:
+        caches = metadata_cache.get_metadata_cache(), metadata_cache.get_token_cache()
+        await metadata_cache.close_metadata_cache()
+        return caches
+
+    return asyncio.run(load())
+
+
+def test_created_cache_directory_is_private(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+
+    cache, token_cache = _token_cache_for(monkeypatch, str(cache_dir))
+
+    assert _mode(cache_dir) == 0o700
+    assert token_cache is cache
+
+
+def test_shared_cache_directory_is_left_alone_and_gets_no_tokens(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "shared"
+    cache_dir.mkdir()
+    cache_dir.chmod(0o755)
+
+    cache, token_cache = _token_cache_for(monkeypatch, str(cache_dir))
+
+    assert _mode(cache_dir) == 0o755
+    assert cache is not None
+    assert token_cache is None
+
+
+def test_existing_default_cache_directory_is_restricted(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "spotify_meta"
+    cache_dir.mkdir()
+    cache_dir.chmod(0o755)
+    monkeypatch.setattr(metadata_cache, "DEFAULT_CACHE_DIR", cache_dir)
+
+    cache, token_cache = _token_cache_for(monkeypatch, "")
+
+    assert _mode(cache_dir) == 0o700
+    assert token_cache is cache
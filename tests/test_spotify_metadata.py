@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import orjson
+import pytest
+
+from backend import spotify_metadata
+
+NULL_TRACK_PREFIX = "null"
+EMBED_HTML = (
+    b'<meta property="og:title" content="Embed Song">'
+    b'<meta property="og:description" content="Listen to Embed Song by Embed Artist on Spotify">'
+)
+
+
+def _track_id(value: int | str) -> str:
+    return str(value).rjust(spotify_metadata.SPOTIFY_ID_LENGTH, "0")
+
+
+def _null_track_id(value: int) -> str:
+    return NULL_TRACK_PREFIX + _track_id(value)[len(NULL_TRACK_PREFIX) :]
+
+
+def _track_payload(track_id: str) -> dict:
+    return {
+        "name": f"Song {track_id[-3:]}",
+        "artists": [{"id": f"artist{track_id[-3:]}", "name": f"Artist {track_id[-3:]}"}],
+        "album": {"name": "Album", "release_date": "2020-01-01"},
+        "duration_ms": 61000,
+        "explicit": False,
+        "popularity": 42,
+    }
+
+
+def _ids_from_url(url: str) -> list[str]:
+    return url.split("?ids=", 1)[1].split(",")
+
+
+class FakeCache:
+    def __init__(self, values: dict[str, object] | None = None) -> None:
+        self.values = {key: json.dumps(value) for key, value in (values or {}).items()}
+        self.ttls: dict[str, int] = {}
+
+    async def get_many(self, keys: list[str]) -> dict[str, str]:
+        return {key: self.values[key] for key in keys if key in self.values}
+
+    async def set_many(self, items: dict[str, str], ttl_seconds: int) -> None:
+        self.values.update(items)
+        self.ttls.update(dict.fromkeys(items, ttl_seconds))
+
+
+@pytest.fixture
+def requests_made(monkeypatch) -> list[str]:
+    urls = []
+
+    async def fake_request(session, method, url, timeout=20, **kwargs) -> bytes:
+        urls.append(url)
+        if url.startswith(spotify_metadata.SPOTIFY_TRACKS_API_URL):
+            tracks = [
+                None if track_id.startswith(NULL_TRACK_PREFIX) else _track_payload(track_id)
+                for track_id in _ids_from_url(url)
+            ]
+            return orjson.dumps({"tracks": tracks})
+        if url.startswith(spotify_metadata.SPOTIFY_ARTISTS_API_URL):
+            artists = [{"genres": ["pop"]} for _ in _ids_from_url(url)]
+            return orjson.dumps({"artists": artists})
+        if url.startswith(spotify_metadata.EMBED_PREFIX):
+            return EMBED_HTML
+        raise AssertionError(f"Unexpected request to {url}")
+
+    async def fake_access_token(session, timeout=20, force_refresh=False) -> str:
+        return "token"
+
+    monkeypatch.setattr(spotify_metadata, "_request", fake_request)
+    monkeypatch.setattr(spotify_metadata, "_get_spotify_access_token", fake_access_token)
+    monkeypatch.setattr(spotify_metadata, "get_client_session", lambda: None)
+    return urls
+
+
+@pytest.fixture
+def cache(monkeypatch) -> FakeCache:
+    fake_cache = FakeCache()
+    monkeypatch.setattr(spotify_metadata, "get_metadata_cache", lambda: fake_cache)
+    return fake_cache
+
+
+def _track_requests(urls: list[str]) -> list[list[str]]:
+    return [
+        _ids_from_url(url)
+        for url in urls
+        if url.startswith(spotify_metadata.SPOTIFY_TRACKS_API_URL)
+    ]
+
+
+def _collect_rows(urls: list[str]) -> dict[int, dict]:
+    async def collect() -> dict[int, dict]:
+        return {index: row async for index, row in spotify_metadata.iter_fill_rows(urls)}
+
+    return asyncio.run(collect())
+
+
+def test_fetch_tracks_batches_ids_and_skips_null_tracks(requests_made):
+    track_ids = [_track_id(index) for index in range(118)] + [
+        _null_track_id(1),
+        _null_track_id(2),
+    ]
+
+    tracks = asyncio.run(spotify_metadata._fetch_tracks(None, track_ids))
+
+    assert _track_requests(requests_made) == [
+        track_ids[0:50],
+        track_ids[50:100],
+        track_ids[100:120],
+    ]
+    assert list(tracks) == track_ids[:118]
+    assert tracks[_track_id(7)]["name"] == "Song 007"
+
+
+def test_iter_fill_rows_fetches_duplicates_once_and_scatters_rows(requests_made, cache):
+    first_id = _track_id(1)
+    second_id = _track_id(2)
+    urls = [
+        f"https://open.spotify.com/track/{first_id}?si=abc",
+        f"https://open.spotify.com/track/{second_id}",
+        "not a spotify url",
+        f"spotify:track:{first_id}",
+        f"https://open.spotify.com/track/{first_id}",
+    ]
+
+    rows = _collect_rows(urls)
+
+    assert _track_requests(requests_made) == [[first_id, second_id]]
+    assert sorted(rows) == [0, 1, 2, 3, 4]
+    for index in (0, 3, 4):
+        assert rows[index]["url"] == urls[index]
+        assert rows[index]["track_name"] == "Song 001"
+        assert rows[index]["artist"] == "Artist 001"
+        assert rows[index]["genre"] == "pop"
+    assert rows[1]["track_name"] == "Song 002"
+    assert rows[2] == {"url": "not a spotify url", **spotify_metadata._blank_metadata()}
+
+
+def test_iter_fill_rows_serves_cache_hits_and_caches_misses(requests_made, cache):
+    cached_id = _track_id(1)
+    missing_id = _track_id(2)
+    cache.values[f"t:{cached_id}"] = json.dumps(
+        {"track_name": "Cached Song", "artist": "Cached Artist"}
+    )
+
+    rows = _collect_rows(
+        [
+            f"https://open.spotify.com/track/{cached_id}",
+            f"https://open.spotify.com/track/{missing_id}",
+        ]
+    )
+
+    assert _track_requests(requests_made) == [[missing_id]]
+    assert rows[0]["track_name"] == "Cached Song"
+    assert rows[0]["artist"] == "Cached Artist"
+    assert rows[1]["track_name"] == "Song 002"
+    assert json.loads(cache.values[f"t:{missing_id}"])["album"] == "Album"
+    assert cache.ttls[f"t:{missing_id}"] == spotify_metadata.TRACK_CACHE_TTL_SECONDS
+
+    requests_made.clear()
+    rows = _collect_rows([f"https://open.spotify.com/track/{missing_id}"])
+
+    assert requests_made == []
+    assert rows[0]["track_name"] == "Song 002"
+
+
+def test_iter_fill_rows_caches_embed_fallback_briefly(requests_made, cache):
+    null_id = _null_track_id(1)
+
+    rows = _collect_rows([f"https://open.spotify.com/track/{null_id}"])
+
+    assert rows[0]["track_name"] == "Embed Song"
+    assert rows[0]["artist"] == "Embed Artist"
+    assert f"{spotify_metadata.EMBED_PREFIX}{null_id}" in requests_made
+    assert cache.ttls[f"t:{null_id}"] == spotify_metadata.FALLBACK_CACHE_TTL_SECONDS
+
+
+def test_write_rows_keeps_urls_as_plain_strings_past_hyperlink_limit(tmp_path):
+    from openpyxl import load_workbook
+
+    output_path = tmp_path / "out.xlsx"
+    row_count = 65_536
+    rows = [
+        [f"https://open.spotify.com/track/{_track_id(index)}", index]
+        for index in range(row_count)
+    ]
+
+    workbook, worksheet = spotify_metadata._open_output_workbook(
+        output_path, "Tracks", ["Spotify URL", "Index"]
+    )
+    spotify_metadata._write_rows(worksheet, 1, rows)
+    workbook.close()
+
+    sheet = load_workbook(output_path, read_only=True)["Tracks"]
+    written = list(sheet.iter_rows(min_row=2, values_only=True))
+    assert len(written) == row_count
+    assert list(written[-1]) == rows[-1]
+    assert list(written[65_530]) == rows[65_530]
+
+
+def test_write_rows_raises_instead_of_dropping_cells(tmp_path):
+    workbook, worksheet = spotify_metadata._open_output_workbook(
+        tmp_path / "out.xlsx", "Tracks", ["Spotify URL", "Index"]
+    )
+    try:
+        with pytest.raises(ValueError, match="row 2"):
+            spotify_metadata._write_rows(worksheet, 1, [["x" * 40_000, 1]])
+    finally:
+        workbook.close()
+
+
+def _write_input_workbook(path, rows: list[list]) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "Tracks"
+    for row in rows:
+        worksheet.append(row)
+    workbook.save(path)
+
+
+def _read_output_rows(path) -> list[tuple]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return list(workbook["Tracks"].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+@pytest.fixture
+def filled_chunks(monkeypatch) -> list[list[str]]:
+    chunks = []
+
+    async def fake_fill_rows_async(urls) -> list[dict]:
+        chunks.append(list(urls))
+        return [
+            {"url": url, "track_name": f"Song {url}", "artist": f"Artist {url}"}
+            for url in urls
+        ]
+
+    monkeypatch.setattr(spotify_metadata, "fill_rows_async", fake_fill_rows_async)
+    return chunks
+
+
+def test_process_workbook_overwrites_existing_fill_columns(tmp_path, filled_chunks):
+    input_path = tmp_path / "tracks.xlsx"
+    _write_input_workbook(
+        input_path,
+        [["Artist", "Spotify URL", "Notes"]]
+        + [["old", f"url{index}", index] for index in range(7)],
+    )
+
+    output_path = asyncio.run(
+        spotify_metadata.process_workbook_async(input_path, chunk_size=3)
+    )
+
+    assert output_path == tmp_path / "tracks_with_metadata.xlsx"
+    assert [len(chunk) for chunk in filled_chunks] == [3, 3, 1]
+    written = _read_output_rows(output_path)
+    assert written[0] == ("Artist", "Spotify URL", "Notes", "Track Name")
+    assert written[1:] == [
+        (f"Artist url{index}", f"url{index}", index, f"Song url{index}")
+        for index in range(7)
+    ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "tracks.xlsx",
+        "tracks_with_metadata.xlsx",
+    ]
+
+
+def test_process_workbook_handles_header_only_sheet(tmp_path, filled_chunks):
+    input_path = tmp_path / "tracks.xlsx"
+    _write_input_workbook(input_path, [["URL"]])
+
+    output_path = asyncio.run(spotify_metadata.process_workbook_async(input_path))
+
+    assert filled_chunks == []
+    assert _read_output_rows(output_path) == [("URL", "Track Name", "Artist")]
+
+
+def test_process_workbook_leaves_no_output_on_failure(tmp_path, monkeypatch):
+    input_path = tmp_path / "tracks.xlsx"
+    _write_input_workbook(
+        input_path, [["Spotify URL"]] + [[f"url{index}"] for index in range(10)]
+    )
+    calls = 0
+
+    async def failing_fill_rows_async(urls) -> list[dict]:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("lookup failed")
+        return [{"url": url, "track_name": "", "artist": ""} for url in urls]
+
+    monkeypatch.setattr(spotify_metadata, "fill_rows_async", failing_fill_rows_async)
+
+    with pytest.raises(RuntimeError, match="lookup failed"):
+        asyncio.run(spotify_metadata.process_workbook_async(input_path, chunk_size=3))
+    with pytest.raises(ValueError, match="Expected column"):
+        asyncio.run(
+            spotify_metadata.process_workbook_async(input_path, url_column="Missing")
+        )
+
+    assert [path.name for path in tmp_path.iterdir()] == ["tracks.xlsx"]